@@ -11,8 +11,24 @@ import argparse
 import configparser
 import cv2
 import numpy as np
+import queue
 import random
-from glob import glob
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba is optional; OpenCV kernels are used without it
+    NUMBA_AVAILABLE = False
+
+try:
+    import cupy as cp
+    CUPY_AVAILABLE = True
+except ImportError:  # CuPy is optional; only needed for use_gpu
+    CUPY_AVAILABLE = False
 
 # Define transition effects
 TRANSITIONS = {
@@ -27,6 +43,24 @@ TRANSITIONS = {
     "slide_right": 8,
 }
 
+# Images are decoded ahead of the encoder on a small thread pool
+# (cv2.imread and cv2.resize release the GIL)
+PREFETCH_WORKERS = 4
+PREFETCH_DEPTH = 3
+
+# Frames waiting for the background writer thread (about 6 MB each at 1080p)
+WRITER_QUEUE_SIZE = 8
+
+# Video encoders selectable with the "encoder" option
+ENCODERS = ("opencv", "ffmpeg")
+
+# Fixed-point scale for fade weights (8 fractional bits)
+FADE_SHIFT = 8
+FADE_ONE = 1 << FADE_SHIFT
+
+# Fade frames rendered per GPU kernel launch (bounds device and host memory)
+GPU_FADE_CHUNK = 8
+
 def read_config(config_path="config.cfg"):
     """Read configuration from config file or use defaults"""
     config = configparser.ConfigParser()
@@ -38,7 +72,9 @@ def read_config(config_path="config.cfg"):
         "frame_rate": "25",  # FPS
         "transition_type": "random",  # Can be one of TRANSITIONS keys or "random"
         "image_duration": "3",  # seconds per image (used when no video_duration)
-        "output_file": "slideshow.mp4"
+        "output_file": "slideshow.mp4",
+        "encoder": "opencv",  # One of ENCODERS
+        "use_gpu": "false"  # Render fades on a CUDA GPU (requires CuPy)
     }
     
     # Read config file if it exists
@@ -55,12 +91,14 @@ def read_config(config_path="config.cfg"):
 def get_image_files(folder_path):
     """Get list of image files from folder"""
     # Supported image extensions
-    extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp']
+    extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp'}
     
-    image_files = []
-    for ext in extensions:
-        image_files.extend(glob(os.path.join(folder_path, f"*{ext}")))
-        image_files.extend(glob(os.path.join(folder_path, f"*{ext.upper()}")))
+    # List the folder once and filter by extension in memory
+    with os.scandir(folder_path) as entries:
+        image_files = [entry.path for entry in entries
+                       if not entry.name.startswith('.')  # Hidden files, as glob skipped them
+                       and os.path.splitext(entry.name)[1].lower() in extensions
+                       and entry.is_file()]
     
     # Sort files by name for consistent order
     image_files.sort()
@@ -72,31 +110,414 @@ def get_image_files(folder_path):
 
 def resize_image(image, width, height):
     """Resize image to target dimensions while preserving aspect ratio"""
+    # Nothing to do if the image already has the target size
+    if image.shape[0] == height and image.shape[1] == width:
+        return image
+    
     # Determine if the image is already 16:9
     h, w = image.shape[:2]
     current_ratio = w / h
     target_ratio = width / height
     
+    # INTER_AREA is faster and sharper for shrinking, INTER_LINEAR for enlarging
+    scale = max(width / w, height / h)
+    interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+    
     if abs(current_ratio - target_ratio) < 0.01:  # Close enough to target ratio
-        return cv2.resize(image, (width, height))
+        return cv2.resize(image, (width, height), interpolation=interpolation)
     
     # Resize and crop to maintain aspect ratio and fill target dimensions
     if current_ratio > target_ratio:  # Image is wider
         new_h = height
         new_w = int(height * current_ratio)
-        img_resized = cv2.resize(image, (new_w, new_h))
+        img_resized = cv2.resize(image, (new_w, new_h), interpolation=interpolation)
         # Crop to center
         start_x = (new_w - width) // 2
         return img_resized[:, start_x:start_x+width]
     else:  # Image is taller
         new_w = width
         new_h = int(width / current_ratio)
-        img_resized = cv2.resize(image, (new_w, new_h))
+        img_resized = cv2.resize(image, (new_w, new_h), interpolation=interpolation)
         # Crop to center
         start_y = (new_h - height) // 2
         return img_resized[start_y:start_y+height, :]
 
-def apply_transition(prev_frame, next_frame, transition_type, progress):
+def load_image(path, width, height):
+    """Read an image and resize it to the target dimensions
+    
+    Returns None if the image could not be read.
+    """
+    image = cv2.imread(path)
+    if image is None:
+        return None
+    # Center crops are strided views; make them contiguous for the frame kernels
+    return np.ascontiguousarray(resize_image(image, width, height))
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _fade_u8(prev_bytes, next_bytes, alpha, out_bytes):
+        """Cross-fade two flattened uint8 frames into out_bytes using 8-bit fixed-point weights
+        
+        alpha is the weight of next_bytes in 1/256 steps; the sums fit in uint16.
+        The fade weight is the same for every channel, so the interleaved BGR bytes
+        are blended as one flat stream that vectorizes without channel shuffles.
+        """
+        a = np.uint16(alpha)
+        inv_a = np.uint16(FADE_ONE - alpha)
+        for i in prange(prev_bytes.size):
+            out_bytes[i] = (prev_bytes[i] * inv_a + next_bytes[i] * a
+                            + np.uint16(FADE_ONE // 2)) >> FADE_SHIFT
+
+if CUPY_AVAILABLE:
+    try:
+        # Same fixed-point blend as _fade_u8; broadcasting a column of alphas
+        # against the two frames renders a batch of fade frames in one launch
+        _fade_gpu_kernel = cp.ElementwiseKernel(
+            "uint8 prev, uint8 nxt, int32 alpha",
+            "uint8 out",
+            f"out = (prev * ({FADE_ONE} - alpha) + nxt * alpha + {FADE_ONE // 2}) >> {FADE_SHIFT}",
+            "fade_gpu",
+        )
+    except Exception:  # CuPy without a usable CUDA toolkit
+        CUPY_AVAILABLE = False
+
+def render_fades_gpu(prev_frame, next_frame, progress_steps):
+    """Render a fade transition on the GPU, yielding the frames in order
+    
+    Both frames are uploaded once; frames are rendered and downloaded in
+    batches of GPU_FADE_CHUNK so memory use doesn't grow with the transition length.
+    """
+    prev_gpu = cp.asarray(prev_frame)
+    next_gpu = cp.asarray(next_frame)
+    for start in range(0, len(progress_steps), GPU_FADE_CHUNK):
+        chunk = progress_steps[start:start + GPU_FADE_CHUNK]
+        alphas = cp.asarray([int(progress * FADE_ONE) for progress in chunk], dtype=cp.int32)
+        frames_gpu = _fade_gpu_kernel(prev_gpu, next_gpu, alphas.reshape(-1, 1, 1, 1))
+        yield from cp.asnumpy(frames_gpu)
+
+def warm_up_gpu():
+    """Compile the GPU fade kernel on a tiny frame
+    
+    Returns False if the GPU can't be used.
+    """
+    tiny = np.zeros((8, 8, 3), dtype=np.uint8)
+    try:
+        list(render_fades_gpu(tiny, tiny, [0.5]))
+    except Exception as e:
+        print(f"Warning: GPU rendering failed ({e}). Rendering on the CPU instead.")
+        return False
+    return True
+
+def warm_up_kernels():
+    """Compile the JIT kernels on a tiny frame so the first transition doesn't pay for it"""
+    if not NUMBA_AVAILABLE:
+        return
+    tiny = np.zeros((8, 8, 3), dtype=np.uint8)
+    _fade_u8(tiny.reshape(-1), tiny.reshape(-1), FADE_ONE // 2, np.empty(tiny.size, dtype=np.uint8))
+
+class FFmpegWriter:
+    """Video writer that pipes frames to an ffmpeg process encoding H.264
+    
+    Mirrors the parts of the cv2.VideoWriter interface used by create_slideshow.
+    Frames are converted to YUV 4:2:0 before they are piped, which is the format
+    the encoder works in and half the bytes of BGR.
+    """
+    
+    writes_repeats = True  # write() takes a repeat count (see write_still)
+    
+    def __init__(self, output_file, frame_rate, width, height):
+        command = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "yuv420p",
+            "-s", f"{width}x{height}", "-r", str(frame_rate),
+            "-i", "-",
+            "-c:v", "libx264", "-preset", "ultrafast",
+            output_file,
+        ]
+        try:
+            self.proc = subprocess.Popen(command, stdin=subprocess.PIPE)
+        except OSError:
+            self.proc = None
+    
+    def isOpened(self):
+        return self.proc is not None and self.proc.poll() is None
+    
+    def write(self, frame, repeat=1):
+        """Write a BGR frame, repeat times in a row"""
+        # Convert once, then hand the buffer straight to the pipe without a tobytes() copy
+        data = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420).data
+        for _ in range(repeat):
+            self.proc.stdin.write(data)
+    
+    def release(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass  # ffmpeg already exited; its status is checked below
+        if self.proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {self.proc.returncode}")
+        self.proc = None
+
+def open_video_writer(output_file, frame_rate, width, height, encoder="opencv"):
+    """Open a video writer for the given encoder (see ENCODERS)"""
+    if encoder == "ffmpeg":
+        return FFmpegWriter(output_file, frame_rate, width, height)
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Use mp4v codec
+    return cv2.VideoWriter(output_file, fourcc, frame_rate, (width, height))
+
+class ThreadedWriter:
+    """Runs a video writer on a background thread fed by a bounded queue
+    
+    Encoding releases the GIL, so the next frames can be composited while
+    earlier ones are encoded. Errors from the writer are raised on the next
+    write() or on release().
+    """
+    
+    writes_repeats = True  # write() takes a repeat count (see write_still)
+    
+    def __init__(self, writer, maxsize=WRITER_QUEUE_SIZE):
+        self.writer = writer
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            # After a failure keep draining so the producer never blocks
+            if self.error is None:
+                try:
+                    write_still(self.writer, *item)
+                except Exception as e:
+                    self.error = e
+    
+    def _raise_error(self):
+        if self.error is not None:
+            raise self.error
+    
+    def isOpened(self):
+        return self.writer.isOpened()
+    
+    def write(self, frame, repeat=1):
+        """Queue a frame to be written repeat times in a row"""
+        self._raise_error()
+        # Copy, since callers reuse their frame buffers
+        self.queue.put((frame.copy(), repeat))
+    
+    def release(self):
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            # Report the original failure, not a follow-on one from closing the broken writer
+            try:
+                self.writer.release()
+            except Exception:
+                pass
+            raise self.error
+        self.writer.release()
+
+def write_still(out, frame, count):
+    """Write the same frame to the video writer count times"""
+    if getattr(out, "writes_repeats", False):
+        # The writer takes the still once for all of its copies
+        out.write(frame, repeat=count)
+        return
+    # Plain cv2.VideoWriter: hoist the bound method out of the loop
+    write = out.write
+    for _ in range(count):
+        write(frame)
+
+def zoom_factor(transition_type, progress):
+    """Scale of the zooming image in a zoom transition at the given progress"""
+    if transition_type == 5:  # Zoom In grows the incoming frame
+        factor = progress
+    else:  # Zoom Out shrinks the outgoing frame
+        factor = 1 - progress
+    return max(factor, 0.1)  # Avoid too small scaling
+
+def scale_for_zoom(frame, factor):
+    """Scale frame by factor for a zoom transition"""
+    h, w = frame.shape[:2]
+    
+    # Size of the scaled image, ensuring a minimum size
+    scaled_w = max(int(w * factor), 10)
+    scaled_h = max(int(h * factor), 10)
+    
+    # Zoom frames are always downscaled, where INTER_AREA is fastest and cleanest
+    return cv2.resize(frame, (scaled_w, scaled_h), interpolation=cv2.INTER_AREA)
+
+def precompute_zoom_frames(frame, transition_type, progress_steps):
+    """Scale frame once for every progress step of a zoom transition"""
+    return [scale_for_zoom(frame, zoom_factor(transition_type, progress))
+            for progress in progress_steps]
+
+def paste_centered(background, scaled, out):
+    """Copy background into out and place scaled centered on top of it
+    
+    Returns False if the scaled image could not be placed.
+    """
+    h, w = background.shape[:2]
+    center_x, center_y = w // 2, h // 2
+    scaled_h, scaled_w = scaled.shape[:2]
+    
+    # Calculate position to place the scaled image centered
+    start_x = max(0, center_x - scaled_w // 2)
+    start_y = max(0, center_y - scaled_h // 2)
+    end_x = min(w, start_x + scaled_w)
+    end_y = min(h, start_y + scaled_h)
+    
+    # Account for partial image placement near edges
+    scaled_start_x = 0
+    scaled_start_y = 0
+    if start_x == 0:
+        scaled_start_x = (scaled_w - (end_x - start_x)) // 2
+    if start_y == 0:
+        scaled_start_y = (scaled_h - (end_y - start_y)) // 2
+    
+    # Place scaled image onto the background
+    np.copyto(out, background)
+    try:
+        out[start_y:end_y, start_x:end_x] = scaled[
+            scaled_start_y:scaled_start_y + (end_y - start_y), 
+            scaled_start_x:scaled_start_x + (end_x - start_x)
+        ]
+    except ValueError:
+        return False
+    return True
+
+def _crossfade(prev_frame, next_frame, progress, out):
+    """Simple crossfade, used as the fallback transition"""
+    return cv2.addWeighted(prev_frame, 1 - progress, next_frame, progress, 0, dst=out)
+
+def _fade(prev_frame, next_frame, progress, out):
+    # Quantize the weight to 1/256 steps so the blend can run in integer arithmetic
+    alpha = int(progress * FADE_ONE)
+    if NUMBA_AVAILABLE and out.flags.c_contiguous:
+        # Blend the frames as flat byte streams
+        _fade_u8(prev_frame.reshape(-1), next_frame.reshape(-1), alpha, out.reshape(-1))
+        return out
+    return cv2.addWeighted(prev_frame, (FADE_ONE - alpha) / FADE_ONE,
+                           next_frame, alpha / FADE_ONE, 0, dst=out)
+
+def _wipe_left(prev_frame, next_frame, cut, out):
+    # Copy each source only into the region it covers
+    np.copyto(out[:, :cut], next_frame[:, :cut])
+    np.copyto(out[:, cut:], prev_frame[:, cut:])
+    return out
+
+def _wipe_right(prev_frame, next_frame, cut, out):
+    # Copy each source only into the region it covers
+    np.copyto(out[:, cut:], next_frame[:, cut:])
+    np.copyto(out[:, :cut], prev_frame[:, :cut])
+    return out
+
+def _wipe_up(prev_frame, next_frame, cut, out):
+    # Copy each source only into the region it covers
+    np.copyto(out[:cut, :], next_frame[:cut, :])
+    np.copyto(out[cut:, :], prev_frame[cut:, :])
+    return out
+
+def _wipe_down(prev_frame, next_frame, cut, out):
+    # Copy each source only into the region it covers
+    np.copyto(out[cut:, :], next_frame[cut:, :])
+    np.copyto(out[:cut, :], prev_frame[:cut, :])
+    return out
+
+def _zoom_in(prev_frame, next_frame, progress, out, scaled=None):
+    # For zoom in, start with next_frame small and grow it
+    if scaled is None:
+        scaled = scale_for_zoom(next_frame, zoom_factor(5, progress))
+    
+    # Create result with prev_frame as background
+    if paste_centered(prev_frame, scaled, out):
+        return out
+    # Fallback to fade if dimensions don't align
+    return _crossfade(prev_frame, next_frame, progress, out)
+
+def _zoom_out(prev_frame, next_frame, progress, out, scaled=None):
+    # For zoom out, start with prev_frame full size and shrink it
+    if scaled is None:
+        scaled = scale_for_zoom(prev_frame, zoom_factor(6, progress))
+    
+    # Create result with next_frame as background
+    if paste_centered(next_frame, scaled, out):
+        return out
+    # Fallback to fade if dimensions don't align
+    return _crossfade(prev_frame, next_frame, progress, out)
+
+def _slide_left(prev_frame, next_frame, offset, out):
+    w = prev_frame.shape[1]
+    
+    # The two parts tile the whole frame, so no background fill is needed
+    # Place part of prev_frame
+    if offset < w:
+        np.copyto(out[:, :w-offset], prev_frame[:, offset:])
+    
+    # Place part of next_frame
+    if offset > 0:
+        np.copyto(out[:, w-offset:], next_frame[:, :offset])
+        
+    return out
+
+def _slide_right(prev_frame, next_frame, offset, out):
+    w = prev_frame.shape[1]
+    
+    # The two parts tile the whole frame, so no background fill is needed
+    # Place part of prev_frame
+    if offset < w:
+        np.copyto(out[:, offset:], prev_frame[:, :w-offset])
+    
+    # Place part of next_frame
+    if offset > 0:
+        np.copyto(out[:, :offset], next_frame[:, w-offset:])
+        
+    return out
+
+# Transition handlers indexed by transition type (see TRANSITIONS). Each renders
+# one frame of the transition into out and returns it. Wipes and slides take the
+# integer cut/offset for the frame (see _CUTS), the others take progress.
+_HANDLERS = (
+    _fade,         # 0
+    _wipe_left,    # 1
+    _wipe_right,   # 2
+    _wipe_up,      # 3
+    _wipe_down,    # 4
+    _zoom_in,      # 5
+    _zoom_out,     # 6
+    _slide_left,   # 7
+    _slide_right,  # 8
+)
+
+# Integer cut (wipes) or offset (slides) for a frame of height h and width w
+_CUTS = {
+    1: lambda h, w, progress: int(w * progress),        # Wipe Left
+    2: lambda h, w, progress: int(w * (1 - progress)),  # Wipe Right
+    3: lambda h, w, progress: int(h * progress),        # Wipe Up
+    4: lambda h, w, progress: int(h * (1 - progress)),  # Wipe Down
+    7: lambda h, w, progress: int(w * progress),        # Slide Left
+    8: lambda h, w, progress: int(w * progress),        # Slide Right
+}
+
+def transition_steps(transition_type, progress_steps, height, width):
+    """Per-frame handler argument for a transition: cuts for wipes and slides, else progress"""
+    cut = _CUTS.get(transition_type)
+    if cut is None:
+        return progress_steps
+    return [cut(height, width, progress) for progress in progress_steps]
+
+def handler_for(transition_type):
+    """Get the handler function that renders the given transition type"""
+    if 0 <= transition_type < len(_HANDLERS):
+        return _HANDLERS[transition_type]
+    # Default to simple crossfade if transition not recognized
+    return _crossfade
+
+def apply_transition(prev_frame, next_frame, transition_type, progress, out=None, scaled=None):
     """Apply transition effect between frames
     
     Args:
@@ -104,172 +525,21 @@ def apply_transition(prev_frame, next_frame, transition_type, progress):
         next_frame: The new/incoming frame
         transition_type: Integer indicating transition type (see TRANSITIONS)
         progress: Float between 0.0 and 1.0 indicating transition progress
+        out: Optional preallocated buffer (same shape as prev_frame) to render into
+        scaled: Optional pre-scaled frame for zoom transitions (see precompute_zoom_frames)
         
     Returns:
         Resulting frame with transition applied
     """
-    if transition_type == 0:  # Fade
-        return cv2.addWeighted(prev_frame, 1 - progress, next_frame, progress, 0)
-    
-    elif transition_type == 1:  # Wipe Left
-        h, w = prev_frame.shape[:2]
-        cut = int(w * progress)
-        result = prev_frame.copy()
-        result[:, :cut] = next_frame[:, :cut]
-        return result
-    
-    elif transition_type == 2:  # Wipe Right
-        h, w = prev_frame.shape[:2]
-        cut = int(w * (1 - progress))
-        result = prev_frame.copy()
-        result[:, cut:] = next_frame[:, cut:]
-        return result
-    
-    elif transition_type == 3:  # Wipe Up
-        h, w = prev_frame.shape[:2]
-        cut = int(h * progress)
-        result = prev_frame.copy()
-        result[:cut, :] = next_frame[:cut, :]
-        return result
-    
-    elif transition_type == 4:  # Wipe Down
-        h, w = prev_frame.shape[:2]
-        cut = int(h * (1 - progress))
-        result = prev_frame.copy()
-        result[cut:, :] = next_frame[cut:, :]
-        return result
-    
-    elif transition_type == 5:  # Zoom In
-        h, w = prev_frame.shape[:2]
-        center_x, center_y = w // 2, h // 2
-        
-        # For zoom in, start with next_frame small and grow it
-        zoom_factor = progress
-        if zoom_factor < 0.1:  # Avoid too small scaling
-            zoom_factor = 0.1
-            
-        # Size of the scaled image
-        scaled_w = int(w * zoom_factor)
-        scaled_h = int(h * zoom_factor)
-        
-        # Ensure minimum size
-        scaled_w = max(scaled_w, 10)
-        scaled_h = max(scaled_h, 10)
-        
-        # Resize next_frame
-        scaled_next = cv2.resize(next_frame, (scaled_w, scaled_h))
-        
-        # Create result with prev_frame as background
-        result = prev_frame.copy()
-        
-        # Calculate position to place the scaled image centered
-        start_x = max(0, center_x - scaled_w // 2)
-        start_y = max(0, center_y - scaled_h // 2)
-        end_x = min(w, start_x + scaled_w)
-        end_y = min(h, start_y + scaled_h)
-        
-        # Account for partial image placement near edges
-        scaled_start_x = 0
-        scaled_start_y = 0
-        if start_x == 0:
-            scaled_start_x = (scaled_w - (end_x - start_x)) // 2
-        if start_y == 0:
-            scaled_start_y = (scaled_h - (end_y - start_y)) // 2
-            
-        # Place scaled image onto result
-        try:
-            result[start_y:end_y, start_x:end_x] = scaled_next[
-                scaled_start_y:scaled_start_y + (end_y - start_y), 
-                scaled_start_x:scaled_start_x + (end_x - start_x)
-            ]
-        except ValueError:
-            # Fallback to fade if dimensions don't align
-            return cv2.addWeighted(prev_frame, 1 - progress, next_frame, progress, 0)
-        
-        return result
-        
-    elif transition_type == 6:  # Zoom Out
-        h, w = prev_frame.shape[:2]
-        center_x, center_y = w // 2, h // 2
-        
-        # For zoom out, start with prev_frame full size and shrink it
-        zoom_factor = 1 - progress
-        if zoom_factor < 0.1:  # Avoid too small scaling
-            zoom_factor = 0.1
-            
-        # Size of the scaled image
-        scaled_w = int(w * zoom_factor)
-        scaled_h = int(h * zoom_factor)
-        
-        # Ensure minimum size
-        scaled_w = max(scaled_w, 10)
-        scaled_h = max(scaled_h, 10)
-        
-        # Resize prev_frame
-        scaled_prev = cv2.resize(prev_frame, (scaled_w, scaled_h))
-        
-        # Create result with next_frame as background
-        result = next_frame.copy()
-        
-        # Calculate position to place the scaled image centered
-        start_x = max(0, center_x - scaled_w // 2)
-        start_y = max(0, center_y - scaled_h // 2)
-        end_x = min(w, start_x + scaled_w)
-        end_y = min(h, start_y + scaled_h)
-        
-        # Account for partial image placement near edges
-        scaled_start_x = 0
-        scaled_start_y = 0
-        if start_x == 0:
-            scaled_start_x = (scaled_w - (end_x - start_x)) // 2
-        if start_y == 0:
-            scaled_start_y = (scaled_h - (end_y - start_y)) // 2
-            
-        # Place scaled image onto result
-        try:
-            result[start_y:end_y, start_x:end_x] = scaled_prev[
-                scaled_start_y:scaled_start_y + (end_y - start_y), 
-                scaled_start_x:scaled_start_x + (end_x - start_x)
-            ]
-        except ValueError:
-            # Fallback to fade if dimensions don't align
-            return cv2.addWeighted(prev_frame, 1 - progress, next_frame, progress, 0)
-        
-        return result
-    
-    elif transition_type == 7:  # Slide Left
-        h, w = prev_frame.shape[:2]
-        offset = int(w * progress)
-        
-        result = np.zeros_like(prev_frame)
-        # Place part of prev_frame
-        if offset < w:
-            result[:, :w-offset] = prev_frame[:, offset:]
-        
-        # Place part of next_frame
-        if offset > 0:
-            result[:, w-offset:] = next_frame[:, :offset]
-            
-        return result
-        
-    elif transition_type == 8:  # Slide Right  
-        h, w = prev_frame.shape[:2]
-        offset = int(w * progress)
-        
-        result = np.zeros_like(prev_frame)
-        # Place part of prev_frame
-        if offset < w:
-            result[:, offset:] = prev_frame[:, :w-offset]
-        
-        # Place part of next_frame
-        if offset > 0:
-            result[:, :offset] = next_frame[:, w-offset:]
-            
-        return result
-        
-    else:
-        # Default to simple crossfade if transition not recognized
-        return cv2.addWeighted(prev_frame, 1 - progress, next_frame, progress, 0)
+    if out is None:
+        out = np.empty_like(prev_frame)
+    
+    handler = handler_for(transition_type)
+    if scaled is not None:
+        return handler(prev_frame, next_frame, progress, out, scaled)
+    h, w = prev_frame.shape[:2]
+    step = transition_steps(transition_type, [progress], h, w)[0]
+    return handler(prev_frame, next_frame, step, out)
 
 def create_slideshow(image_files, config):
     """Create slideshow video from images"""
@@ -278,6 +548,17 @@ def create_slideshow(image_files, config):
     video_duration = float(config["video_duration"])
     frame_rate = int(config["frame_rate"])
     output_file = config["output_file"]
+    encoder = config["encoder"]
+    if encoder not in ENCODERS:
+        print(f"Warning: Unknown encoder '{encoder}'. Using 'opencv' instead.")
+        encoder = "opencv"
+    
+    use_gpu = config.getboolean("use_gpu")
+    if use_gpu and not CUPY_AVAILABLE:
+        print("Warning: use_gpu is set but CuPy is not available. Rendering on the CPU instead.")
+        use_gpu = False
+    elif use_gpu:
+        use_gpu = warm_up_gpu()
     
     # Determine transition type
     transition_type_config = config["transition_type"]
@@ -316,69 +597,111 @@ def create_slideshow(image_files, config):
     # Target 16:9 aspect ratio if not already
     target_w = w
     target_h = int(w * 9 / 16)
+    if encoder == "ffmpeg":
+        # YUV 4:2:0 needs even dimensions; drop the odd row/column
+        target_w -= target_w % 2
+        target_h -= target_h % 2
     if abs(target_h - h) > 5:  # If height differs significantly from 16:9
         print(f"Images are not 16:9. Will resize from {w}x{h} to {target_w}x{target_h}")
     
     # Create video writer
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Use mp4v codec
-    out = cv2.VideoWriter(output_file, fourcc, frame_rate, (target_w, target_h))
+    out = open_video_writer(output_file, frame_rate, target_w, target_h, encoder)
     
     if not out.isOpened():
         raise ValueError(f"Could not open output video file: {output_file}")
     
+    # Encode on a background thread while the next frames are composited
+    out = ThreadedWriter(out)
+    
+    # Every transition frame is rendered into this one buffer; the writer
+    # copies each frame before the next one is rendered
+    frame_buf = np.empty((target_h, target_w, 3), dtype=np.uint8)
+    
+    warm_up_kernels()
+    
     # Process images
     prev_image = None
     frame_count = 0
     total_frames = int(video_duration * frame_rate)
     
+    # The frame schedule is the same for every image, so work it out once
+    frames_per_image = int(image_duration * frame_rate)
+    transition_frames = int(transition_duration * frame_rate)
+    progress_steps = [j / transition_frames for j in range(transition_frames)]
+    
+    # Choose the transition for each pair of images up front
+    if use_random_transitions:
+        schedule = [random.randint(0, 8) for _ in range(total_transitions)]  # Random transition from 0-8
+    else:
+        schedule = [transition_type] * total_transitions
+    
+    # Resolve each transition to its handler and per-frame arguments once, so
+    # frames call the handler directly with e.g. a precomputed wipe cut
+    steps_by_type = {t: transition_steps(t, progress_steps, target_h, target_w) for t in set(schedule)}
+    plan = [(handler_for(t), steps_by_type[t]) for t in schedule]
+    
     print(f"Creating slideshow with {num_images} images, {total_frames} frames...")
     
-    for i, img_path in enumerate(image_files):
-        # Read and resize current image
-        curr_img = cv2.imread(img_path)
-        if curr_img is None:
-            print(f"Warning: Could not read image: {img_path}, skipping...")
-            continue
-            
-        curr_img = resize_image(curr_img, target_w, target_h)
+    # Decode and resize upcoming images on worker threads while the current one is encoded
+    with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as pool:
+        pending = deque(pool.submit(load_image, path, target_w, target_h)
+                        for path in image_files[:PREFETCH_DEPTH])
         
-        # For the first image, no transition needed
-        if i == 0:
-            # Add frames for the first image duration
-            frames_per_image = int(image_duration * frame_rate)
-            for _ in range(frames_per_image):
-                if frame_count < total_frames:
-                    out.write(curr_img)
-                    frame_count += 1
-        else:
-            # Choose transition for this pair of images
-            if use_random_transitions:
-                curr_transition = random.randint(0, 8)  # Random transition from 0-8
+        for i, img_path in enumerate(image_files):
+            # Collect the current image and queue the next one
+            curr_img = pending.popleft().result()
+            if i + PREFETCH_DEPTH < num_images:
+                pending.append(pool.submit(load_image, image_files[i + PREFETCH_DEPTH], target_w, target_h))
+            
+            if curr_img is None:
+                print(f"Warning: Could not read image: {img_path}, skipping...")
+                continue
+            
+            # For the first image, no transition needed
+            if i == 0:
+                # Add frames for the first image duration
+                still_frames = min(frames_per_image, total_frames - frame_count)
+                write_still(out, curr_img, still_frames)
+                frame_count += still_frames
             else:
-                curr_transition = transition_type
+                curr_transition = schedule[i - 1]
             
-            # Add transition frames
-            transition_frames = int(transition_duration * frame_rate)
-            for j in range(transition_frames):
-                if frame_count < total_frames:
-                    progress = j / transition_frames
-                    frame = apply_transition(prev_image, curr_img, curr_transition, progress)
-                    out.write(frame)
-                    frame_count += 1
+                # Add transition frames, clamped to the remaining frame budget
+                steps = progress_steps[:total_frames - frame_count]
+                
+                # Scale the zooming image for every step up front
+                zoom_frames = None
+                if curr_transition == 5:  # Zoom In
+                    zoom_frames = precompute_zoom_frames(curr_img, curr_transition, steps)
+                elif curr_transition == 6:  # Zoom Out
+                    zoom_frames = precompute_zoom_frames(prev_image, curr_transition, steps)
+                
+                write = out.write
+                if use_gpu and curr_transition == 0:  # Fade
+                    # Render the whole fade on the GPU, then stream it to the writer
+                    for frame in render_fades_gpu(prev_image, curr_img, steps):
+                        write(frame)
+                else:
+                    handler, handler_steps = plan[i - 1]
+                    if zoom_frames is not None:
+                        for progress, scaled in zip(steps, zoom_frames):
+                            write(handler(prev_image, curr_img, progress, frame_buf, scaled))
+                    else:
+                        for step in handler_steps[:len(steps)]:
+                            write(handler(prev_image, curr_img, step, frame_buf))
+                frame_count += len(steps)
             
-            # Add frames for current image duration (after transition)
-            frames_per_image = int(image_duration * frame_rate)
-            for _ in range(frames_per_image):
-                if frame_count < total_frames:
-                    out.write(curr_img)
-                    frame_count += 1
-        
-        # Update prev_image for next iteration
-        prev_image = curr_img
-        
-        # Print progress
-        progress_pct = min(100, int((frame_count / total_frames) * 100))
-        print(f"Progress: {progress_pct}% ({frame_count}/{total_frames} frames)", end='\r')
+                # Add frames for current image duration (after transition)
+                still_frames = min(frames_per_image, total_frames - frame_count)
+                write_still(out, curr_img, still_frames)
+                frame_count += still_frames
+            
+            # Update prev_image for next iteration
+            prev_image = curr_img
+            
+            # Print progress
+            progress_pct = min(100, int((frame_count / total_frames) * 100))
+            print(f"Progress: {progress_pct}% ({frame_count}/{total_frames} frames)", end='\r')
     
     # Release resources
     out.release()
@@ -391,6 +714,7 @@ def main():
     parser.add_argument("folder", help="Folder containing the images")
     parser.add_argument("-c", "--config", default="config.cfg", help="Path to configuration file")
     parser.add_argument("-o", "--output", help="Output file path (overrides config)")
+    parser.add_argument("-e", "--encoder", choices=ENCODERS, help="Video encoder (overrides config)")
     args = parser.parse_args()
     
     # Verify folder exists
@@ -404,6 +728,10 @@ def main():
     if args.output:
         config["output_file"] = args.output
     
+    # Override encoder if specified
+    if args.encoder:
+        config["encoder"] = args.encoder
+    
     # Get list of image files
     try:
         image_files = get_image_files(args.folder)